@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import re
+from pathlib import Path
+
+# Matches "# CONFIG_FOO is not set" (group 1) or "CONFIG_FOO=value" (groups 2, 3)
+# in a single compiled pass over the whole file
+_CONFIG_RE = re.compile(r'^(?:# (CONFIG_\w+) is not set|(CONFIG_\w+)=(.*))$', re.M)
+
+# Hashed membership beats scanning a list literal per line
+_BOOL_TRUE = frozenset(('y', 'yes', 'true'))
+_BOOL_FALSE = frozenset(('n', 'no', 'false'))
+
+
+def generate_config_header(config_file=".config", header_file="kernel/Kernel/Config.h"):
+    """
+    Generates a C header with #define lines from the .config file so the
+    kernel sources can test configuration options at compile time
+    """
+    if not os.path.exists(config_file):
+        print(f"Error: Config file {config_file} does not exist")
+        print("Run menuconfig.py first to create one")
+        sys.exit(1)
+
+    # Path.read_text avoids the buffered-IO setup of open().read() for a
+    # whole-file read
+    text = Path(config_file).read_text()
+
+    out = [
+        "/* Automatically generated by config_header_generator.py - do not edit */\n",
+        "#ifndef _Kernel_Config_h_\n",
+        "#define _Kernel_Config_h_\n",
+        "\n",
+    ]
+
+    count = 0
+    for m in _CONFIG_RE.finditer(text):
+        if m.lastindex == 1:
+            name = m.group(1)
+            value = '0'
+        else:
+            name = m.group(2)
+            config_value = m.group(3).strip()
+            lowered = config_value.lower()
+            if lowered in _BOOL_TRUE:
+                value = '1'
+            elif lowered in _BOOL_FALSE:
+                value = '0'
+            elif config_value[:1] == '"':
+                value = config_value
+            elif (config_value.isdigit()
+                  or (config_value[:1] == '-' and config_value[1:].isdigit())):
+                # menuconfig writes signed integers as-is; keep them unquoted
+                value = config_value
+            else:
+                value = f"\"{config_value}\""
+
+        out.append(f"#ifndef {name}\n#define {name} {value}\n#endif\n\n")
+        count += 1
+
+    out.append("#endif\n")
+
+    # One buffer fill and one write instead of four f.write calls per define
+    Path(header_file).write_text(''.join(out))
+
+    print(f"Generated {header_file} with {count} options from {config_file}")
+
+
+if __name__ == "__main__":
+    config_file = sys.argv[1] if len(sys.argv) > 1 else ".config"
+    header_file = sys.argv[2] if len(sys.argv) > 2 else "kernel/Kernel/Config.h"
+    generate_config_header(config_file, header_file)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import re
+from pathlib import Path
+
+GITIGNORE_FILE = ".gitignore"
+
+# One compiled match per filename instead of a chain of endswith/startswith
+# checks: build artifacts by extension, editor backup/lock files, and
+# generated tooling output
+_ARTIFACT_RE = re.compile(
+    r'.*\.(?:bin|elf|iso|o|obj|out|map|dbg|sym|log|lst|swp|swo)$'
+    r'|^#.*#$'
+    r'|.*~$'
+    r'|^compile_commands\.json$'
+)
+
+# Directories that never contain tracked sources; pruned before descending
+_PRUNE_DIRS = ('.git', 'build', 'obj', 'iso')
+
+# Patterns every checkout should ignore; the tuple keeps the output order
+# deterministic, the frozenset gives O(1) membership tests
+_REQUIRED_ORDERED = (
+    'build/',
+    'obj/',
+    '*.o',
+    '*.obj',
+    '*.bin',
+    '*.elf',
+    '*.iso',
+    '*.out',
+    '*.map',
+    '*.dbg',
+    '*.sym',
+    '*.lst',
+    '*.swp',
+    '*.swo',
+    '*~',
+    'compile_commands.json',
+)
+_REQUIRED = frozenset(_REQUIRED_ORDERED)
+
+
+def _walk_files(root):
+    """
+    Yields the directory entries below root with os.scandir, pruning
+    uninteresting directories by name before descending. Unlike os.walk
+    this allocates no per-directory lists and keeps the cached stat
+    information on each DirEntry.
+    """
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in _PRUNE_DIRS:
+                    yield from _walk_files(entry.path)
+            else:
+                yield entry
+
+
+def scan_build_artifacts(root='.'):
+    """
+    Walks the tree and returns build artifacts that should be covered by
+    .gitignore, matching each filename against one precompiled regex
+    """
+    # Every yielded path starts with root, so a fixed-length slice replaces
+    # the abspath/normpath work os.path.relpath would redo per file
+    prefix_len = len(root.rstrip(os.sep)) + 1
+    artifacts = []
+    for entry in _walk_files(root):
+        if _ARTIFACT_RE.match(entry.name):
+            artifacts.append(entry.path[prefix_len:])
+    return artifacts
+
+
+def ensure_gitignore_entries(gitignore_path=GITIGNORE_FILE):
+    """
+    Makes sure the standard build-artifact patterns are present in .gitignore
+    """
+    current_content = ""
+    if os.path.exists(gitignore_path):
+        current_content = Path(gitignore_path).read_text()
+
+    # Exact-line membership via a hashed set: a substring test over the whole
+    # file would be O(N*M) and match '*.o' inside '*.obj'
+    existing = set(line.strip() for line in current_content.splitlines()
+                   if line.strip() and not line.startswith('#'))
+    if not _REQUIRED.difference(existing):
+        print("All required entries already present in .gitignore")
+        return
+    missing = [entry for entry in _REQUIRED_ORDERED if entry not in existing]
+
+    parts = [current_content]
+    if current_content and not current_content.endswith('\n'):
+        parts.append('\n')
+    parts.append('# Build artifacts\n')
+    parts.append('\n'.join(missing) + '\n')
+    Path(gitignore_path).write_text(''.join(parts))
+    print(f"Added {len(missing)} entries to {gitignore_path}")
+
+
+def cleanup_gitignore_duplicates(gitignore_path=GITIGNORE_FILE):
+    """
+    Removes duplicate entries from .gitignore while keeping the first
+    occurrence of each pattern
+    """
+    if not os.path.exists(gitignore_path):
+        print(f"Error: {gitignore_path} does not exist")
+        return
+
+    lines = Path(gitignore_path).read_text().splitlines()
+
+    # dict.fromkeys gives an order-preserving dedup of the rule lines in
+    # one hash pass; comments and blank lines pass through untouched
+    pending = dict.fromkeys(line.strip() for line in lines
+                            if line.strip() and not line.strip().startswith('#'))
+    unique_lines = []
+    for line in lines:
+        stripped = line.strip()
+        if stripped and not stripped.startswith('#'):
+            if stripped not in pending:
+                continue
+            del pending[stripped]
+        unique_lines.append(line)
+
+    removed = len(lines) - len(unique_lines)
+    if removed == 0:
+        print(f"No duplicate entries in {gitignore_path}")
+        return
+    Path(gitignore_path).write_text('\n'.join(unique_lines) + '\n')
+    print(f"Removed {removed} duplicate entries from {gitignore_path}")
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'ensure'
+    if command == 'ensure':
+        ensure_gitignore_entries()
+    elif command == 'cleanup':
+        cleanup_gitignore_duplicates()
+    elif command == 'scan':
+        artifacts = scan_build_artifacts()
+        if artifacts:
+            print("Build artifacts found in the tree:")
+            for path in artifacts:
+                print(f"  {path}")
+        else:
+            print("No build artifacts found")
+    else:
+        print(f"Usage: python3 {sys.argv[0]} [ensure|cleanup|scan]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
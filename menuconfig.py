@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import re
+from pathlib import Path
+
+CONFIG_FILE = ".config"
+
+# Matches "# CONFIG_FOO is not set" (group 1) or "CONFIG_FOO=value" (groups 2, 3)
+# in a single compiled pass over the whole file
+_CONFIG_RE = re.compile(r'^(?:# (CONFIG_\w+) is not set|(CONFIG_\w+)=(.*))$', re.M)
+
+
+class Config(dict):
+    """
+    Configuration dict that keeps a lazily rebuilt sorted key list, so
+    saving and viewing do not re-sort the whole config on every call, and
+    lazily rebuilt per-type buckets so the option menus classify each
+    value once instead of running isinstance over the whole dict per
+    render. Value changes never disturb the key order; only adding or
+    removing keys invalidates the sorted cache, while any mutation
+    invalidates the buckets.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sorted_keys = None
+        self._buckets = None
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            self._sorted_keys = None
+        self._buckets = None
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._sorted_keys = None
+        self._buckets = None
+        super().__delitem__(key)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._sorted_keys = None
+        self._buckets = None
+
+    def sorted_items(self):
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self)
+        return [(key, self[key]) for key in self._sorted_keys]
+
+    def bucket(self, typ):
+        if self._buckets is None:
+            buckets = {bool: [], int: [], str: []}
+            for key, value in self.items():
+                # bool must be tested first: it is a subclass of int
+                if isinstance(value, bool):
+                    buckets[bool].append((key, value))
+                elif isinstance(value, int):
+                    buckets[int].append((key, value))
+                else:
+                    buckets[str].append((key, value))
+            self._buckets = buckets
+        return self._buckets[typ]
+
+
+def _sorted_items(config):
+    """
+    Returns the config items in sorted order, using the cached view when
+    a Config instance is passed
+    """
+    if isinstance(config, Config):
+        return config.sorted_items()
+    return sorted(config.items())
+
+
+def default_config():
+    """
+    Returns the default kernel configuration options, mirroring the
+    defaults in kernel/Kernel/KernelConfig.h
+    """
+    return {
+        # Memory settings
+        'CONFIG_KERNEL_HEAP_SIZE': 16 * 1024 * 1024,
+        'CONFIG_MAX_PROCESSES': 128,
+        'CONFIG_MAX_THREADS_PER_PROCESS': 16,
+        # Timer settings
+        'CONFIG_TIMER_FREQUENCY': 100,
+        'CONFIG_SCHEDULER_QUANTUM_MS': 10,
+        # Process settings
+        'CONFIG_PREEMPTIVE_SCHEDULING': True,
+        'CONFIG_COOPERATIVE_SCHEDULING': True,
+        # Memory management settings
+        'CONFIG_PAGE_SIZE': 4096,
+        'CONFIG_MAX_VIRTUAL_MEMORY_PER_PROCESS': 512 * 1024 * 1024,
+        # Debug settings
+        'CONFIG_KERNEL_DEBUGGING': False,
+        'CONFIG_VERBOSE_LOGGING': False,
+        'CONFIG_MEMORY_DEBUGGING': False,
+        # I/O settings
+        'CONFIG_CONSOLE_BUFFER_SIZE': 4096,
+        'CONFIG_SERIAL_LOGGING': True,
+        'CONFIG_VGA_LOGGING': True,
+        # File system settings
+        'CONFIG_MAX_OPEN_FILES': 32,
+        'CONFIG_MAX_MOUNT_POINTS': 8,
+        'CONFIG_VFS_LAYER': True,
+        # Network settings (for future expansion)
+        'CONFIG_NETWORKING': False,
+        'CONFIG_MAX_NETWORK_CONNECTIONS': 16,
+        # Boot settings
+        'CONFIG_BOOT_MESSAGE': "LittleKernel",
+    }
+
+
+def parse_config_value(value):
+    """
+    Converts a raw .config value string into a bool, int or string
+    """
+    if value == 'y':
+        return True
+    if value == 'n':
+        return False
+    if value.startswith('"') and value.endswith('"') and len(value) >= 2:
+        return value[1:-1]
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+# ANSI clear-screen-and-home sequence; writing it avoids forking a shell
+# for 'clear' on every menu redraw
+_CLEAR = '\x1b[2J\x1b[H' if os.name == 'posix' else None
+
+
+def _clear_screen():
+    if _CLEAR:
+        sys.stdout.write(_CLEAR)
+        sys.stdout.flush()
+    else:
+        os.system('cls')
+
+
+# Parsed-config cache keyed by (path, mtime_ns, size) so the menu loop does
+# not reparse an unchanged .config; bounded so stale entries cannot pile up
+_config_cache = {}
+_CONFIG_CACHE_LIMIT = 16
+
+
+def load_config(config_file=CONFIG_FILE):
+    """
+    Loads kernel configuration options from a .config file into a dict.
+    Parses the whole file with one precompiled regex pass instead of
+    per-line string operations, and reuses the parsed result as long as
+    the file is unchanged on disk.
+    """
+    config = {}
+    try:
+        st = os.stat(config_file)
+    except FileNotFoundError:
+        return config
+
+    cache_key = (config_file, st.st_mtime_ns, st.st_size)
+    cached = _config_cache.get(cache_key)
+    if cached is not None:
+        # Copy so menu edits cannot leak back into the cache
+        return dict(cached)
+
+    # Path.read_text avoids the buffered-IO setup of open().read() for a
+    # whole-file read
+    text = Path(config_file).read_text()
+
+    for m in _CONFIG_RE.finditer(text):
+        if m.lastindex == 1:
+            # "# CONFIG_FOO is not set" form
+            config[m.group(1)] = False
+        else:
+            # "CONFIG_FOO=value" form
+            config[m.group(2)] = parse_config_value(m.group(3).strip())
+
+    if len(_config_cache) >= _CONFIG_CACHE_LIMIT:
+        _config_cache.clear()
+    _config_cache[cache_key] = dict(config)
+    return config
+
+
+def save_config(config, config_file=CONFIG_FILE):
+    """
+    Saves the configuration dict back to the .config file
+    """
+    lines = [
+        "# LittleKernel configuration",
+        "# This file is generated by menuconfig.py",
+        "",
+    ]
+    for name, value in _sorted_items(config):
+        if isinstance(value, bool):
+            if value:
+                lines.append(f"{name}=y")
+            else:
+                lines.append(f"# {name} is not set")
+        elif isinstance(value, int):
+            lines.append(f"{name}={value}")
+        else:
+            lines.append(f"{name}=\"{value}\"")
+    Path(config_file).write_text('\n'.join(lines) + '\n')
+    print(f"Configuration saved to {config_file}")
+
+
+def view_config(config):
+    """
+    Prints the current configuration values
+    """
+    _clear_screen()
+    print("Current kernel configuration:")
+    print("-" * 40)
+    for name, value in _sorted_items(config):
+        if isinstance(value, bool):
+            print(f"  {name} = {'y' if value else 'n'}")
+        else:
+            print(f"  {name} = {value}")
+    print("-" * 40)
+    input("Press Enter to continue...")
+
+
+def _filter(config, typ):
+    """
+    Returns the (name, value) pairs of one option type as an indexable
+    list, so menu selections do not rebuild a dict plus a key list
+    """
+    if isinstance(config, Config):
+        return config.bucket(typ)
+    if typ is int:
+        # bool is a subclass of int; keep booleans out of the integer menu
+        return [(k, v) for k, v in config.items()
+                if isinstance(v, int) and not isinstance(v, bool)]
+    return [(k, v) for k, v in config.items() if isinstance(v, typ)]
+
+
+def toggle_bool_options(config):
+    """
+    Lets the user toggle boolean configuration options
+    """
+    while True:
+        _clear_screen()
+        options = _filter(config, bool)
+        print("Boolean options (enter number to toggle, 0 to go back):")
+        for i, (name, value) in enumerate(options, 1):
+            print(f"  {i}. [{'*' if value else ' '}] {name}")
+        try:
+            choice = int(input("Choice: "))
+        except ValueError:
+            continue
+        if choice == 0:
+            return
+        if 1 <= choice <= len(options):
+            key = options[choice - 1][0]
+            config[key] = not config[key]
+
+
+def set_int_options(config):
+    """
+    Lets the user change integer configuration options
+    """
+    while True:
+        _clear_screen()
+        options = _filter(config, int)
+        print("Integer options (enter number to change, 0 to go back):")
+        for i, (name, value) in enumerate(options, 1):
+            print(f"  {i}. {name} = {value}")
+        try:
+            choice = int(input("Choice: "))
+        except ValueError:
+            continue
+        if choice == 0:
+            return
+        if 1 <= choice <= len(options):
+            key = options[choice - 1][0]
+            try:
+                config[key] = int(input(f"New value for {key}: "))
+            except ValueError:
+                print("Invalid integer value")
+
+
+def set_string_options(config):
+    """
+    Lets the user change string configuration options
+    """
+    while True:
+        _clear_screen()
+        options = _filter(config, str)
+        print("String options (enter number to change, 0 to go back):")
+        for i, (name, value) in enumerate(options, 1):
+            print(f"  {i}. {name} = \"{value}\"")
+        try:
+            choice = int(input("Choice: "))
+        except ValueError:
+            continue
+        if choice == 0:
+            return
+        if 1 <= choice <= len(options):
+            key = options[choice - 1][0]
+            config[key] = input(f"New value for {key}: ")
+
+
+def use_dialog_interface(config):
+    """
+    Edits boolean options through the external 'dialog' checklist if it is
+    installed, saving the result back to the .config file
+    """
+    import subprocess
+    import shutil
+
+    if not shutil.which('dialog'):
+        print("The 'dialog' program is not installed")
+        input("Press Enter to continue...")
+        return
+
+    args = ['dialog', '--checklist', 'LittleKernel configuration', '0', '0', '0']
+    bool_options = {k: v for k, v in config.items() if isinstance(v, bool)}
+    for name, value in sorted(bool_options.items()):
+        args.extend([name, '', 'on' if value else 'off'])
+
+    result = subprocess.run(args, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        return
+
+    selected = set(result.stderr.split())
+    for name in bool_options:
+        config[name] = name in selected
+    save_config(config)
+
+
+def display_menu(config):
+    """
+    Displays the main menu and returns the user's choice
+    """
+    _clear_screen()
+    print("LittleKernel configuration")
+    print("=" * 40)
+    print("  1. Toggle boolean options")
+    print("  2. Set integer options")
+    print("  3. Set string options")
+    print("  4. View configuration")
+    print("  5. Use dialog interface")
+    print("  6. Save and exit")
+    print("  7. Exit without saving")
+    print("=" * 40)
+    return input("Choice: ").strip()
+
+
+def main():
+    config = Config(default_config())
+    config.update(load_config())
+
+    while True:
+        choice = display_menu(config)
+        if choice == '1':
+            toggle_bool_options(config)
+        elif choice == '2':
+            set_int_options(config)
+        elif choice == '3':
+            set_string_options(config)
+        elif choice == '4':
+            view_config(config)
+        elif choice == '5':
+            use_dialog_interface(config)
+            # dialog writes the file itself; pick up any external edits too
+            config.update(load_config())
+        elif choice == '6':
+            save_config(config)
+            return
+        elif choice == '7':
+            return
+
+
+if __name__ == "__main__":
+    main()
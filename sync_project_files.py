@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+KERNEL_DIR = "kernel/Kernel"
+LIBRARY_DIR = "kernel/Library"
+MAKEFILE = "Makefile"
+
+# One compiled match per filename instead of chained endswith checks
+_CPP_RE = re.compile(r'.+\.(?:cpp|h)$')
+_ASM_RE = re.compile(r'.+\.asm$')
+
+# Directories that never contain project sources; pruned before descending
+_PRUNE_DIRS = ('.git', 'build', 'obj', 'iso')
+
+# Matches the source-list variable assignments in one pass, tolerating the
+# 'VAR:=', 'VAR :=' and 'VAR =' spellings that plain startswith checks miss
+_MK_RE = re.compile(r'^(SOURCES|KERNEL_SOURCES|LIB_SOURCES|ASM_SOURCES)\s*:?=\s*(.*)$')
+
+
+def _walk_files(root):
+    """
+    Yields the directory entries below root with os.scandir, pruning
+    non-source directories by name before descending. Unlike os.walk this
+    allocates no per-directory lists and keeps the cached stat information
+    on each DirEntry.
+    """
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in _PRUNE_DIRS:
+                    yield from _walk_files(entry.path)
+            else:
+                yield entry
+
+
+def get_cpp_files(directory):
+    """
+    Returns the C++ source and header files under a project directory,
+    relative to that directory
+    """
+    # Every yielded path starts with the directory prefix, so a
+    # fixed-length slice replaces os.path.relpath per file
+    prefix_len = len(directory.rstrip(os.sep)) + 1
+    return sorted(entry.path[prefix_len:]
+                  for entry in _walk_files(directory)
+                  if _CPP_RE.match(entry.name))
+
+
+def get_asm_files(directory):
+    """
+    Returns the assembly source files under a project directory,
+    relative to that directory
+    """
+    prefix_len = len(directory.rstrip(os.sep)) + 1
+    return sorted(entry.path[prefix_len:]
+                  for entry in _walk_files(directory)
+                  if _ASM_RE.match(entry.name))
+
+
+def get_upp_files(project_file):
+    """
+    Returns the files currently listed in a .upp project file
+    """
+    content = Path(project_file).read_text()
+
+    m = re.search(r'^file\b(.*?);', content, re.M | re.S)
+    if not m:
+        return []
+
+    files = []
+    for entry in m.group(1).split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        # The first token is the file name (or a quoted separator label);
+        # the rest are item options such as "separator"
+        files.append(entry.split()[0].strip('"'))
+    return files
+
+
+def update_upp_project(project_file, files):
+    """
+    Appends source files that exist on disk but are missing from the .upp
+    project file list
+    """
+    content = Path(project_file).read_text()
+
+    listed = set(get_upp_files(project_file))
+    missing = [f for f in files if f not in listed]
+    if not missing:
+        print(f"{project_file} is up to date")
+        return
+
+    m = re.search(r'^file\b.*?(;)', content, re.M | re.S)
+    if not m:
+        print(f"Error: no file section found in {project_file}")
+        return
+
+    addition = ''.join(f",\n\t{name}" for name in missing)
+    content = content[:m.start(1)].rstrip() + addition + content[m.start(1):]
+
+    Path(project_file).write_text(content)
+    print(f"Added {len(missing)} files to {project_file}: {', '.join(missing)}")
+
+
+def _rewrite_makefile(mutator):
+    """
+    Reads the Makefile once, applies a mutation to its lines and writes the
+    result back in one pass, so callers never stack read/write cycles. The
+    tree normally builds with umk (see build.sh), so a missing Makefile is
+    not an error.
+    """
+    if not os.path.exists(MAKEFILE):
+        print(f"No {MAKEFILE} present, skipping (umk build does not use one)")
+        return
+
+    original = Path(MAKEFILE).read_text()
+
+    new_content = '\n'.join(mutator(original.splitlines())) + '\n'
+
+    # Skipping a no-op write keeps the Makefile mtime stable, so make does
+    # not redo its dependency graph after every sync
+    if new_content == original:
+        print(f"{MAKEFILE} is up to date")
+        return
+
+    Path(MAKEFILE).write_text(new_content)
+    print(f"Updated source lists in {MAKEFILE}")
+
+
+def update_makefile(kernel_cpp_files, lib_cpp_files, asm_files):
+    """
+    Rewrites the source-list variables in the Makefile to match the files
+    on disk
+    """
+    kernel_sources = ' '.join(os.path.join(KERNEL_DIR, f) for f in kernel_cpp_files
+                              if f.endswith('.cpp'))
+    lib_sources = ' '.join(os.path.join(LIBRARY_DIR, f) for f in lib_cpp_files
+                           if f.endswith('.cpp'))
+    asm_sources = ' '.join(os.path.join(KERNEL_DIR, f) for f in asm_files)
+
+    # One hash lookup per matched line instead of comparing the captured
+    # name against each variable in turn
+    replacements = {
+        'SOURCES': f"SOURCES := {kernel_sources} {lib_sources}",
+        'KERNEL_SOURCES': f"KERNEL_SOURCES := {kernel_sources}",
+        'LIB_SOURCES': f"LIB_SOURCES := {lib_sources}",
+        'ASM_SOURCES': f"ASM_SOURCES := {asm_sources}",
+    }
+
+    def mutate(lines):
+        new_lines = []
+        for line in lines:
+            m = _MK_RE.match(line)
+            new_lines.append(replacements[m.group(1)] if m else line)
+        return new_lines
+
+    _rewrite_makefile(mutate)
+
+
+def add_file_to_projects(filename):
+    """
+    Adds a single source file to the project files it belongs to
+    """
+    if filename.startswith(LIBRARY_DIR):
+        project_file = os.path.join(LIBRARY_DIR, 'Library.upp')
+        relative = os.path.relpath(filename, LIBRARY_DIR)
+    else:
+        project_file = os.path.join(KERNEL_DIR, 'Kernel.upp')
+        relative = os.path.relpath(filename, KERNEL_DIR)
+
+    update_upp_project(project_file, [relative])
+    sync_makefile()
+
+
+def remove_file_from_projects(filename):
+    """
+    Removes a single source file from the project files that list it
+    """
+    basename = os.path.basename(filename)
+    removed_any = False
+    for project_file in (os.path.join(KERNEL_DIR, 'Kernel.upp'),
+                         os.path.join(LIBRARY_DIR, 'Library.upp')):
+        content = Path(project_file).read_text()
+
+        m = re.search(r'^file\b(.*?);', content, re.M | re.S)
+        if not m:
+            continue
+
+        # Split the section on commas like get_upp_files does, so the
+        # ';'-terminated final entry and entries carrying item options
+        # (e.g. 'Kernel.h separator') match too
+        entries = [entry.strip() for entry in m.group(1).split(',')
+                   if entry.strip()]
+        kept = [entry for entry in entries
+                if entry.split()[0].strip('"') != basename]
+        if len(kept) == len(entries):
+            continue
+
+        section = 'file\n\t' + ',\n\t'.join(kept) + ';'
+        content = content[:m.start()] + section + content[m.end():]
+        Path(project_file).write_text(content)
+        print(f"Removed {basename} from {project_file}")
+        removed_any = True
+
+    if not removed_any:
+        print(f"{basename} is not listed in any project file")
+        return
+
+    sync_makefile()
+
+
+def _scan_sources():
+    """
+    Runs the three independent tree scans on a small thread pool. The
+    walks are IO-bound on directory entries, so they overlap well despite
+    the GIL.
+    """
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        kernel = ex.submit(get_cpp_files, KERNEL_DIR)
+        lib = ex.submit(get_cpp_files, LIBRARY_DIR)
+        asm = ex.submit(get_asm_files, KERNEL_DIR)
+        return kernel.result(), lib.result(), asm.result()
+
+
+def sync_makefile():
+    """
+    Regenerates the Makefile source lists from the files on disk
+    """
+    kernel_cpp_files, lib_cpp_files, asm_files = _scan_sources()
+    update_makefile(kernel_cpp_files, lib_cpp_files, asm_files)
+
+
+def sync_projects():
+    """
+    Brings the .upp project files and the Makefile in line with the
+    source files on disk
+    """
+    kernel_cpp_files, lib_cpp_files, asm_files = _scan_sources()
+
+    update_upp_project(os.path.join(KERNEL_DIR, 'Kernel.upp'),
+                       kernel_cpp_files + asm_files)
+    update_upp_project(os.path.join(LIBRARY_DIR, 'Library.upp'),
+                       lib_cpp_files)
+    update_makefile(kernel_cpp_files, lib_cpp_files, asm_files)
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'sync'
+    if command == 'sync':
+        sync_projects()
+    elif command == 'add' and len(sys.argv) > 2:
+        add_file_to_projects(sys.argv[2])
+    elif command == 'remove' and len(sys.argv) > 2:
+        remove_file_from_projects(sys.argv[2])
+    else:
+        print(f"Usage: python3 {sys.argv[0]} [sync|add <file>|remove <file>]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,81 +2,379 @@
 
 import sys
 import os
+import mmap
+import struct
+import subprocess
+import shutil
+from pathlib import Path
+
+# Progress chatter is suppressed with --quiet so bulk invocations from a
+# build system do not pay a line-buffered stdout flush per message; errors
+# always go to stderr
+_quiet = False
+
+
+def _info(message):
+    if not _quiet:
+        print(message)
+
+
+def _error(message):
+    sys.stderr.write(message + '\n')
+
+
+# Resolve mcopy once so every spawn skips the child-side $PATH walk. Images
+# handled by the in-process writer never need mtools, so a missing binary
+# only becomes an error when the fallback is actually taken.
+_MCOPY = shutil.which('mcopy')
+
+# Fixed part of the fallback invocation; '-D o' overwrites existing entries
+# and '-i' takes the image path as the next argument
+_MCOPY_TEMPLATE = (_MCOPY or 'mcopy', '-D', 'o', '-i')
+
+
+def _fat12_get(fat, n):
+    """Reads FAT12 entry n from the FAT bytes"""
+    i = n + n // 2
+    if n & 1:
+        return (fat[i] >> 4) | (fat[i + 1] << 4)
+    return fat[i] | ((fat[i + 1] & 0x0F) << 8)
+
+
+def _fat12_set(fat, n, value):
+    """Writes FAT12 entry n into the FAT bytes"""
+    i = n + n // 2
+    if n & 1:
+        fat[i] = (fat[i] & 0x0F) | ((value & 0x0F) << 4)
+        fat[i + 1] = (value >> 4) & 0xFF
+    else:
+        fat[i] = value & 0xFF
+        fat[i + 1] = (fat[i + 1] & 0xF0) | ((value >> 8) & 0x0F)
+
+
+def write_kernel_to_fat_image(floppy_image_path, kernel_path, name='KERNEL'):
+    """
+    Writes the kernel directly into a FAT12/16 image without spawning
+    mtools. Returns True on success and False when the image does not
+    carry a usable FAT layout (the caller then falls back to mcopy).
+    """
+    return _write_kernels_atomic(floppy_image_path, [(kernel_path, name)])
+
+
+def _write_kernels_atomic(floppy_image_path, staged):
+    """
+    Stages (path, image name) pairs into an in-memory copy of the image
+    and publishes the result with os.replace, so readers never observe a
+    half-written image and a failed batch leaves the original untouched
+    for the mcopy fallback
+    """
+    data = bytearray(Path(floppy_image_path).read_bytes())
+
+    for kernel_path, name in staged:
+        if not _write_kernel_mapped(data, Path(kernel_path).read_bytes(), name):
+            return False
+
+    tmp_path = floppy_image_path + '.tmp'
+    Path(tmp_path).write_bytes(data)
+    os.replace(tmp_path, floppy_image_path)
+    return True
+
+
+def _write_kernel_mapped(mm, kernel_data, name):
+    # A truncated image cannot hold a boot sector, let alone a FAT
+    if len(mm) < 512:
+        return False
+
+    # BIOS parameter block, offset 11 of the boot sector
+    (bytes_per_sector, sectors_per_cluster, reserved_sectors, num_fats,
+     root_entries, total_sectors16, _media, fat_sectors) = \
+        struct.unpack('<HBHBHHBH', mm[11:24])
+
+    if bytes_per_sector not in (512, 1024, 2048, 4096):
+        return False
+    if sectors_per_cluster == 0 or (sectors_per_cluster & (sectors_per_cluster - 1)):
+        return False
+    if num_fats == 0 or root_entries == 0 or fat_sectors == 0:
+        return False
+    total_sectors = total_sectors16 or struct.unpack('<I', mm[32:36])[0]
+    if total_sectors == 0 or total_sectors * bytes_per_sector > len(mm):
+        return False
+
+    root_start = (reserved_sectors + num_fats * fat_sectors) * bytes_per_sector
+    root_sectors = (root_entries * 32 + bytes_per_sector - 1) // bytes_per_sector
+    data_start = root_start + root_sectors * bytes_per_sector
+    cluster_size = sectors_per_cluster * bytes_per_sector
+    if data_start >= total_sectors * bytes_per_sector:
+        return False  # reserved/FAT/root regions leave no data area
+    cluster_count = (total_sectors * bytes_per_sector - data_start) // cluster_size
+    if cluster_count >= 65525:
+        return False  # FAT32 image; leave it to mtools
+    fat12 = cluster_count < 4085
+    eof_mark = 0xFFF if fat12 else 0xFFFF
+
+    fat_start = reserved_sectors * bytes_per_sector
+    fat = bytearray(mm[fat_start:fat_start + fat_sectors * bytes_per_sector])
+
+    # A malformed BPB can understate fat_sectors; make sure the FAT really
+    # covers the highest cluster number before indexing into it
+    last_cluster = cluster_count + 1
+    if fat12:
+        fat_needed = last_cluster + last_cluster // 2 + 2
+    else:
+        fat_needed = (last_cluster + 1) * 2
+    if len(fat) < fat_needed:
+        return False
+
+    def fat_get(n):
+        if fat12:
+            return _fat12_get(fat, n)
+        return struct.unpack_from('<H', fat, n * 2)[0]
+
+    def fat_set(n, value):
+        if fat12:
+            _fat12_set(fat, n, value)
+        else:
+            struct.pack_into('<H', fat, n * 2, value)
+
+    # Find an existing 8.3 entry for the kernel, or the first free slot
+    base, _, ext = name.partition('.')
+    entry_name = base.ljust(8)[:8].upper().encode() + ext.ljust(3)[:3].upper().encode()
+    entry_offset = None
+    for i in range(root_entries):
+        off = root_start + i * 32
+        first = mm[off]
+        if first == 0x00 or first == 0xE5:
+            if entry_offset is None:
+                entry_offset = off
+            if first == 0x00:
+                break
+            continue
+        if mm[off:off + 11] == entry_name and not (mm[off + 11] & 0x18):
+            entry_offset = off
+            # Free the old cluster chain before reallocating
+            cluster = struct.unpack_from('<H', mm, off + 26)[0]
+            while 2 <= cluster < 2 + cluster_count:
+                next_cluster = fat_get(cluster)
+                fat_set(cluster, 0)
+                cluster = next_cluster
+            break
+    if entry_offset is None:
+        return False  # root directory is full
+
+    # Allocate a fresh chain for the kernel data
+    needed = max(1, (len(kernel_data) + cluster_size - 1) // cluster_size)
+    free_clusters = []
+    for cluster in range(2, 2 + cluster_count):
+        if fat_get(cluster) == 0:
+            free_clusters.append(cluster)
+            if len(free_clusters) == needed:
+                break
+    if len(free_clusters) < needed:
+        return False  # image is full
+
+    for i, cluster in enumerate(free_clusters):
+        fat_set(cluster, free_clusters[i + 1] if i + 1 < needed else eof_mark)
+        chunk_offset = data_start + (cluster - 2) * cluster_size
+        chunk = kernel_data[i * cluster_size:(i + 1) * cluster_size]
+        mm[chunk_offset:chunk_offset + len(chunk)] = chunk
+
+    # Write every FAT copy back
+    for i in range(num_fats):
+        off = fat_start + i * fat_sectors * bytes_per_sector
+        mm[off:off + len(fat)] = fat
+
+    # Directory entry: name, archive attribute, first cluster, size
+    entry = bytearray(32)
+    entry[0:11] = entry_name
+    entry[11] = 0x20
+    struct.pack_into('<H', entry, 26, free_clusters[0])
+    struct.pack_into('<I', entry, 28, len(kernel_data))
+    mm[entry_offset:entry_offset + 32] = bytes(entry)
+    return True
+
+
+class FloppyUpdateSession:
+    """
+    Keeps a floppy image open across repeated updates, for watch-mode
+    build loops that restage the kernel many times per session. mtools
+    has no batch REPL that could be kept alive as a worker process, so
+    the session instead holds the image mapped in-process — repeated
+    updates reuse one open mmap and one prebuilt mcopy argv template,
+    paying fork/exec only when the image cannot be written in-process.
+    """
+
+    def __init__(self, floppy_image_path):
+        self.floppy_image_path = floppy_image_path
+        self._file = open(floppy_image_path, 'r+b')
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        self._mcopy_argv = (*_MCOPY_TEMPLATE, floppy_image_path)
+
+    def copy(self, kernel_paths):
+        """
+        Stages the given files into the image; returns True on success
+        """
+        in_process = True
+        for kernel_path in kernel_paths:
+            data = open(kernel_path, 'rb').read()
+            if not _write_kernel_mapped(self._mm, data,
+                                        os.path.basename(kernel_path).upper()):
+                in_process = False
+                break
+        if in_process:
+            self._mm.flush()
+            return True
+
+        if _MCOPY is None:
+            _error("Error: mcopy not found and the image needs the mtools fallback")
+            return False
+        result = subprocess.run([*self._mcopy_argv, *kernel_paths, '::'],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            _error(f"Error running mcopy: {result.stderr.decode('utf-8', 'replace')}")
+            return False
+        return True
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _make_stamp(kernel_stats, image_st):
+    return ' '.join(f"{st.st_size} {st.st_mtime_ns}" for st in kernel_stats) \
+        + f" {image_st.st_size} {image_st.st_mtime_ns}"
+
+
+def _write_stamp(stamp_path, kernel_stats, floppy_image_path):
+    """
+    Records what was written so the next unchanged build is a no-op;
+    os.replace keeps the stamp update atomic
+    """
+    stamp = _make_stamp(kernel_stats, os.stat(floppy_image_path))
+    with open(stamp_path + '.tmp', 'w') as f:
+        f.write(stamp + '\n')
+    os.replace(stamp_path + '.tmp', stamp_path)
+
 
 def update_floppy_image(floppy_image_path, kernel_path):
     """
-    Updates a floppy image by adding or replacing the kernel file using mtools
+    Back-compat shim for the common single-kernel update
+    """
+    update_floppy_image_many(floppy_image_path, [kernel_path])
+
+
+def update_floppy_image_many(floppy_image_path, kernel_paths):
+    """
+    Adds or replaces files in a floppy image in one pass, writing the FAT
+    image in-process when possible and falling back to a single batched
+    mcopy invocation. Each file is stored under its uppercased basename.
     """
-    print(f"Updating {floppy_image_path} with kernel from {kernel_path}")
-    
-    # Check if files exist
-    if not os.path.exists(floppy_image_path):
-        print(f"Error: Floppy image {floppy_image_path} does not exist")
+    _info(f"Updating {floppy_image_path} with {', '.join(kernel_paths)}")
+
+    # One stat per path doubles as the existence check (no separate
+    # os.path.exists probe, no TOCTOU window) and feeds the change stamp
+    try:
+        image_st = os.stat(floppy_image_path)
+    except FileNotFoundError:
+        _error(f"Error: Floppy image {floppy_image_path} does not exist")
         sys.exit(1)
-        
-    if not os.path.exists(kernel_path):
-        print(f"Error: Kernel file {kernel_path} does not exist")
+
+    kernel_stats = []
+    for kernel_path in kernel_paths:
+        try:
+            kernel_stats.append(os.stat(kernel_path))
+        except FileNotFoundError:
+            _error(f"Error: Kernel file {kernel_path} does not exist")
+            sys.exit(1)
+
+    # Skip the copy entirely when neither the staged files nor the image
+    # changed since the last update
+    stamp_path = floppy_image_path + '.kernel.stamp'
+    stamp = _make_stamp(kernel_stats, image_st)
+    try:
+        with open(stamp_path) as f:
+            if f.read().strip() == stamp:
+                _info("Kernel unchanged, floppy image is up to date")
+                return
+    except OSError:
+        pass
+
+    # Try the in-process FAT writer first; it avoids the mtools subprocesses
+    # and the temporary mtoolsrc entirely
+    try:
+        staged = [(kernel_path, os.path.basename(kernel_path).upper())
+                  for kernel_path in kernel_paths]
+        if _write_kernels_atomic(floppy_image_path, staged):
+            _info("Successfully updated kernel in floppy image!")
+            _write_stamp(stamp_path, kernel_stats, floppy_image_path)
+            return
+    except (OSError, struct.error) as e:
+        _error(f"In-process FAT write failed ({e}), falling back to mtools")
+
+    if _MCOPY is None:
+        _error("Error: mcopy not found and the image needs the mtools fallback")
         sys.exit(1)
-    
-    # Create a temporary mtools configuration file
-    import tempfile
-    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.mtoolsrc') as mtoolsrc:
-        mtoolsrc.write(f"drive z: file=\"{floppy_image_path}\"\n")
-        mtoolsrc_path = mtoolsrc.name
-    
+
     try:
-        # Import subprocess to run mtools commands
-        import subprocess
-        
-        # Make sure the target directory exists in the image (root directory is already there)
-        # Try to create the kernel file using mcopy
-        result = subprocess.run([
-            'mcopy', 
-            '-i', floppy_image_path,  # Use -i option directly
-            '-D', 'o',  # Overwrite if exists
-            kernel_path,
-            'z:',
-        ], env={**os.environ, 'MTOOLSRC': mtoolsrc_path}, capture_output=True, text=True)
-        
+        # One deterministic batched call: '::' names the image root for every
+        # staged file, the image comes from -i, and '-D o' overwrites existing
+        # entries, so mtools parses the BPB and flushes the FAT once for all
+        # files instead of once per file.
+        # Discard stdout at the fd level and keep stderr as bytes; decoding
+        # only happens on the failure path
+        result = subprocess.run(
+            [*_MCOPY_TEMPLATE, floppy_image_path, *kernel_paths, '::'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
         if result.returncode != 0:
-            print(f"Error running mcopy: {result.stderr}")
-            # The error might be because the filesystem is not standard FAT
-            # Let's try creating the file directly using mmd first, then copy
-            result2 = subprocess.run([
-                'mmd', 
-                '-i', floppy_image_path,
-                'z:/KERNEL'
-            ], env={**os.environ, 'MTOOLSRC': mtoolsrc_path}, capture_output=True, text=True)
-            # Actually, mmd is for directories, not files
-            
-            # Try mcopy again
-            result = subprocess.run([
-                'mcopy', 
-                '-i', floppy_image_path,
-                '-D', 'o',  # Overwrite if exists
-                kernel_path,
-                'z:/KERNEL'
-            ], env={**os.environ, 'MTOOLSRC': mtoolsrc_path}, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                print(f"Final mcopy error: {result.stderr}")
-                sys.exit(1)
-        
-        print("Successfully updated kernel in floppy image!")
-        
+            _error(f"Error running mcopy: {result.stderr.decode('utf-8', 'replace')}")
+            sys.exit(1)
+
+        _info("Successfully updated kernel in floppy image!")
+        _write_stamp(stamp_path, kernel_stats, floppy_image_path)
+
     except Exception as e:
-        print(f"Error updating floppy image: {str(e)}")
+        _error(f"Error updating floppy image: {str(e)}")
         sys.exit(1)
-    finally:
-        # Clean up the temporary configuration file
-        os.unlink(mtoolsrc_path)
+
+def update_many(images_and_kernels):
+    """
+    Updates several images in one process invocation, for build matrices
+    that produce one floppy per target. Takes (floppy_image_path,
+    kernel_paths) pairs, runs the read/modify/replace rounds on a small
+    thread pool so the per-image IO overlaps, and returns the list of
+    images whose update failed instead of exiting on the first error.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def worker(job):
+        floppy_image_path, kernel_paths = job
+        try:
+            update_floppy_image_many(floppy_image_path, list(kernel_paths))
+        except SystemExit:
+            return floppy_image_path
+        return None
+
+    with ThreadPoolExecutor(max_workers=min(8, len(images_and_kernels) or 1)) as ex:
+        results = list(ex.map(worker, images_and_kernels))
+    return [image for image in results if image is not None]
+
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python3 update_fat_image.py <floppy_image_path> <kernel_path>")
+    args = sys.argv[1:]
+    if '-q' in args or '--quiet' in args:
+        _quiet = True
+        args = [a for a in args if a not in ('-q', '--quiet')]
+
+    if len(args) < 2:
+        print("Usage: python3 update_fat_image.py [-q|--quiet] <floppy_image_path> <kernel_path> [more files...]")
         sys.exit(1)
-    
-    floppy_image_path = sys.argv[1]
-    kernel_path = sys.argv[2]
-    
-    update_floppy_image(floppy_image_path, kernel_path)
\ No newline at end of file
+
+    floppy_image_path = args[0]
+
+    update_floppy_image_many(floppy_image_path, args[1:])
\ No newline at end of file